@@ -1,7 +1,10 @@
 import collections
+import os
+import struct
 
 import pygame
 from pygame import Surface
+from pygame.mixer import Sound
 
 import renethack
 from renethack.util import validate
@@ -11,10 +14,15 @@ Config = collections.namedtuple('Config', 'fullscreen resolution volume')
 # resolution: (int, int)
 # volume: float
 
-def apply(config: Config) -> Surface:
+CONFIG_FORMAT = struct.Struct('<?IId')
+# The binary layout of a config file: fullscreen, resolution width,
+# resolution height and volume.
+
+def apply(config: Config, music: Sound) -> Surface:
     """Apply the given config and return the resulting surface object.
 
-    `pygame.display.set_mode` is used to apply the config.
+    `pygame.display.set_mode` is used to apply the config, and the
+    volume is applied to `music`.
     """
     validate(apply, locals())
 
@@ -25,5 +33,45 @@ def apply(config: Config) -> Surface:
         if config.fullscreen else 0
         )
 
-    pygame.mixer.music.set_volume(config.volume)
+    music.set_volume(config.volume)
     return pygame.display.set_mode(config.resolution, flag)
+
+def load(path: str, default: Config) -> Config:
+    """Read a config from the file at `path`.
+
+    Returns `default` if the file does not exist or is not a valid
+    config file.
+    """
+    validate(load, locals())
+
+    try:
+        with open(path, mode='rb') as file:
+            fullscreen, width, height, volume = CONFIG_FORMAT.unpack(
+                file.read())
+
+    except (OSError, struct.error):
+        return default
+
+    return Config(
+        fullscreen=fullscreen,
+        resolution=(width, height),
+        volume=volume
+        )
+
+def save(path: str, config: Config) -> None:
+    """Write `config` to the file at `path`.
+
+    The config is written to a temporary file which then replaces the
+    file at `path`, so that the file is never left partially written.
+    """
+    validate(save, locals())
+
+    temp_path = path + '.tmp'
+
+    width, height = config.resolution
+
+    with open(temp_path, mode='wb') as file:
+        file.write(CONFIG_FORMAT.pack(
+            config.fullscreen, width, height, config.volume))
+
+    os.replace(temp_path, path)
@@ -4,21 +4,40 @@ import textwrap
 from types import GeneratorType
 
 import pygame
-from pygame import Surface, PixelArray, Rect
+from pygame import Surface, Rect
 from pygame.event import EventType
 from pygame.font import Font
 
 import renethack
 from renethack.entity_types import Hero, Score
 from renethack.world_types import World
-from renethack.util import validate, get_maindir, raw_filename, clamp, min_clamp, max_clamp, xrange
+from renethack.util import validate, get_maindir, raw_filename, min_clamp, max_clamp, xrange
 
 RESOLUTIONS = [(800, 600), (1280, 1024), (1366, 768), (1920, 1080)]
 # The list of valid resolutions for the game window.
 
+RESOLUTION_INDICES = {res: i for i, res in enumerate(RESOLUTIONS)}
+# A map of each valid resolution to its index in `RESOLUTIONS`.
+
+font_paths = {}
+# A map of font family names to the font files that
+# `pygame.font.match_font` found for them.
+
+fonts = {}
+# A map of (font file, size) pairs to loaded `Font` objects.
+
+icon_atlases = {}
+# A map of tile lengths to the results of `make_icon_atlases`.
+
+images = {}
+# A map of file names to the unscaled images loaded from them.
+
 class Label:
     """Fixed text that is always visible."""
 
+    EVENT_TYPES = frozenset()
+    # The types of event that `check_event` responds to.
+
     def __init__(
             self,
             pos: tuple,
@@ -45,31 +64,47 @@ class Label:
 
         self.pos = (surface_w * pos_x, surface_h * pos_y)
 
-        self.font = Font(
-            pygame.font.match_font(font_type),
-            int(surface_h * height)
-            )
+        self.font = load_font(font_type, int(surface_h * height))
 
         self.text = text
         self.alignment = alignment
         self.colour = colour
 
+        self.font_render = None
+        # The surface that the text was last rendered to.
+
+        self.rendered_text = None
+        # The text that `self.font_render` contains.
+
+        self.rendered_rect = None
+        # The area of the surface that the text was last rendered to.
+
     # A `Label` object has no need to check for events or update
     # itself, so `check_event` and `step` are empty.
 
     def check_event(self, event: EventType) -> None:
         """Check `event` with this element."""
-        validate(self.check_event, locals())
 
     def step(self, ms_per_step: float) -> None:
         """Update this element."""
-        validate(self.step, locals())
 
-    def render(self, surface: Surface) -> None:
-        """Render this label to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this label to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        # Rendering text is slow, so it is only done again when the
+        # text has changed.
+
+        changed = self.text != self.rendered_text
 
-        font_render = self.font.render(self.text, True, self.colour)
+        if changed:
+            self.font_render = self.font.render(self.text, True, self.colour)
+            self.rendered_text = self.text
+
+        font_render = self.font_render
         x, y = self.pos
 
         if self.alignment == 'centre':
@@ -85,11 +120,29 @@ class Label:
         else:
             raise ValueError('invalid alignment of {}'.format(self.alignment))
 
-        surface.blit(font_render, (x - x_offset, y - y_offset))
+        rect = surface.blit(font_render, (x - x_offset, y - y_offset))
+
+        # If the text has changed, the area that the old text covered
+        # has changed as well.
+
+        if not changed:
+            dirty_rects = []
+
+        elif self.rendered_rect is None:
+            dirty_rects = [rect]
+
+        else:
+            dirty_rects = [rect.union(self.rendered_rect)]
+
+        self.rendered_rect = rect
+        return dirty_rects
 
 class Button:
     """Displays text in a box and detects click events."""
 
+    EVENT_TYPES = frozenset({pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN})
+    # The types of event that `check_event` responds to.
+
     def __init__(
             self,
             pos: tuple,
@@ -119,12 +172,28 @@ class Button:
         # The rectangle that will be displayed on the screen to
         # indicate the area that can be clicked.
 
+        self.bounds = (
+            self.rect.left,
+            self.rect.top,
+            self.rect.right,
+            self.rect.bottom
+            )
+        # The edges of `self.rect`. Mouse positions are compared with
+        # these directly, which is faster than `Rect.collidepoint`.
+
         self.text = text
 
-        self.font = Font(
-            pygame.font.match_font('sans'),
-            int(self.rect.height * 0.8)
-            )
+        self.font = load_font('sans', int(self.rect.height * 0.8))
+
+        self.font_render = None
+        # The surface that the text was last rendered to.
+
+        self.rendered_key = None
+        # The text and hover state that `self.font_render` was
+        # rendered with.
+
+        self.rendered_rect = None
+        # The area of the surface that this button last covered.
 
         self.hover = False
         # Whether the button is being hovered over.
@@ -132,35 +201,50 @@ class Button:
         self.pressed = False
         # Whether the button has been clicked.
 
+        self.pressed_this_step = False
+        # Whether the click event occured during the current step.
+
+        self.event_handlers = {
+            pygame.MOUSEMOTION: self.mouse_motion,
+            pygame.MOUSEBUTTONDOWN: self.mouse_button_down
+            }
+        # A map of event types to the methods that handle them.
+
     def check_event(self, event: EventType) -> None:
         """Update this button using `event`."""
-        validate(self.check_event, locals())
+
+        handler = self.event_handlers.get(event.type)
+
+        if handler is not None:
+            handler(event)
+
+    def mouse_motion(self, event: EventType) -> None:
+        """Update this button using a mouse motion event."""
 
         # If the mouse is located inside the rectangle, set `self.hover`
-        # to `True`, else set it to `False`. If there is a click inside
-        # the rectangle, set `self.hover` to `True`.
+        # to `True`, else set it to `False`.
 
-        if event.type == pygame.MOUSEMOTION:
+        left, top, right, bottom = self.bounds
+        x, y = event.pos
 
-            if self.rect.collidepoint(event.pos):
-                self.hover = True
+        self.hover = left <= x < right and top <= y < bottom
 
-            else:
-                self.hover = False
+    def mouse_button_down(self, event: EventType) -> None:
+        """Update this button using a mouse button event."""
 
-        elif (event.type == pygame.MOUSEBUTTONDOWN
-                and self.rect.collidepoint(event.pos)
-                and event.button == 1):
+        # If there is a click inside the rectangle, set `self.pressed`
+        # to `True`.
 
-            self.pressed = True
+        left, top, right, bottom = self.bounds
+        x, y = event.pos
+
+        if left <= x < right and top <= y < bottom and event.button == 1:
 
+            self.pressed = True
             self.pressed_this_step = True
-            # Set a temporary variable to track which step the click
-            # event occured.
 
     def step(self, ms_per_step: float) -> None:
         """Step this button by `ms_per_step`."""
-        validate(self.step, locals())
 
         # Only set `self.pressed` to `False` if the click event
         # happened during the last step, not this one.
@@ -172,31 +256,63 @@ class Button:
 
             else:
                 self.pressed = False
-                del self.pressed_this_step
 
-    def render(self, surface: Surface) -> None:
-        """Render this button to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this button to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
 
         colour = (38, 68, 102) if self.hover else (78, 78, 78)
         surface.fill(colour, self.rect)
 
-        font_render = self.font.render(
-            self.text,
-            True,
-            (255, 255, 255),
-            colour
-            )
+        # The text's background colour depends on the hover state, so
+        # the text must be rendered again if either has changed.
+
+        changed = (self.text, self.hover) != self.rendered_key
+
+        if changed:
+
+            self.font_render = self.font.render(
+                self.text,
+                True,
+                (255, 255, 255),
+                colour
+                )
+
+            self.rendered_key = (self.text, self.hover)
+
+        font_render = self.font_render
 
         x_offset = font_render.get_width() / 2
         y_offset = font_render.get_height() / 2
         x, y = self.rect.center
 
-        surface.blit(font_render, (x - x_offset, y - y_offset))
+        text_rect = surface.blit(font_render, (x - x_offset, y - y_offset))
+        rect = self.rect.union(text_rect)
+
+        # The text may be wider than the button, so the area that the
+        # old text covered must be included if it has changed.
+
+        if not changed:
+            dirty_rects = []
+
+        elif self.rendered_rect is None:
+            dirty_rects = [rect]
+
+        else:
+            dirty_rects = [rect.union(self.rendered_rect)]
+
+        self.rendered_rect = rect
+        return dirty_rects
 
 class Image:
     """Displays an image loaded from a file."""
 
+    EVENT_TYPES = frozenset()
+    # The types of event that `check_event` responds to.
+
     def __init__(self, filename: str, pos: tuple, height: float) -> None:
         """Initialise a new `Image` object.
 
@@ -210,7 +326,14 @@ class Image:
 
         surface_w, surface_h = pygame.display.get_surface().get_size()
         pos_x, pos_y = pos
-        raw_img = pygame.image.load(filename)
+
+        # Loading an image reads and decodes the whole file, so each
+        # file is only loaded once.
+
+        if filename not in images:
+            images[filename] = pygame.image.load(filename)
+
+        raw_img = images[filename]
 
         # When resizing the image to fit `height`, the image ratio must
         # be preserved.
@@ -223,28 +346,48 @@ class Image:
             surface_h*pos_y - height_px/2
             )
 
+        # The image must be converted to the display's pixel format so
+        # it does not need to be converted every time it is rendered.
+
         self.image = pygame.transform.scale(
             raw_img,
             (int(width_px), int(height_px))
-            )
+            ).convert_alpha()
+
+        self.rendered = False
+        # Whether this image has been rendered before.
 
     def check_event(self, event: EventType) -> None:
         """Check `event` with this element."""
-        validate(self.check_event, locals())
 
     def step(self, ms_per_step: float) -> None:
         """Update this element."""
-        validate(self.step, locals())
 
-    def render(self, surface: Surface) -> None:
-        """Render this element to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this element to the given surface.
 
-        surface.blit(self.image, self.top_left)
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        rect = surface.blit(self.image, self.top_left)
+
+        # The image never changes, so its area only needs to be updated
+        # the first time it is rendered.
+
+        if self.rendered:
+            return []
+
+        else:
+            self.rendered = True
+            return [rect]
 
 class TextBox:
     """Displays text in a box that the user has input."""
 
+    EVENT_TYPES = frozenset({pygame.KEYDOWN})
+    # The types of event that `check_event` responds to.
+
     def __init__(self, pos: tuple, height: float) -> None:
         """Initialise a new `TextBox` object.
 
@@ -281,13 +424,15 @@ class TextBox:
             colour=(255, 255, 255)
             )
 
+        self.rendered = False
+        # Whether this text box has been rendered before.
+
     def get_text(self) -> str:
         """Returns the text of the label."""
         return self.label.text
 
     def check_event(self, event: EventType) -> None:
         """Check `event` with this element."""
-        validate(self.check_event, locals())
 
         # If backspace is pressed, the last character must be removed.
         # If any other key is pressed, add its character to the label.
@@ -302,18 +447,32 @@ class TextBox:
 
     def step(self, ms_per_step: float) -> None:
         """Update this element."""
-        validate(self.step, locals())
 
-    def render(self, surface: Surface) -> None:
-        """Render this element to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this element to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
 
         surface.fill((255, 255, 255), self.underline_rect)
-        self.label.render(surface)
+        dirty_rects = self.label.render(surface)
+
+        # The underline never changes, so its area only needs to be
+        # updated the first time it is rendered.
+
+        if not self.rendered:
+            self.rendered = True
+            dirty_rects.append(self.underline_rect)
+
+        return dirty_rects
 
 class WorldDisplay:
     """Displays a `World` using a grid of rectangles."""
 
+    EVENT_TYPES = frozenset({pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN})
+    # The types of event that `check_event` responds to.
+
     def __init__(
             self,
             pos: tuple,
@@ -351,55 +510,51 @@ class WorldDisplay:
             rect_height // level_length
             )
 
-        def icon_entries() -> GeneratorType:
-            """Generates a dict of names to tile icons."""
-
-            icon_dir = os.path.join(get_maindir(), 'data', 'icons')
-
-            # All of the image files in the icons directory must be
-            # loaded into a map of icon names to `Surface` objects.
-
-            for file in os.listdir(icon_dir):
-
-                _, ext = os.path.splitext(file)
-
-                if ext.lower() == '.png':
-
-                    full_path = os.path.join(icon_dir, file)
-                    name = raw_filename(file)
+        # Creating the icon atlases is slow, so they are shared between
+        # displays that have the same tile length.
 
-                    icon = pygame.transform.scale(
-                        pygame.image.load(full_path),
-                        (self.tile_length, self.tile_length)
-                        )
+        if self.tile_length not in icon_atlases:
+            icon_atlases[self.tile_length] = make_icon_atlases(
+                self.tile_length)
 
-                    yield name, icon
+        self.atlas, self.hover_atlas, self.icon_rects = \
+            icon_atlases[self.tile_length]
+        # `self.atlas` contains every icon, and `self.hover_atlas` is a
+        # highlighted copy of it, used to render the tile that is being
+        # hovered over. `self.icon_rects` is a map of icon names to the
+        # areas of the atlases that contain them.
 
-        self.icons = dict(icon_entries())
+        display_botleft_x, display_botleft_y = self.rect.bottomleft
 
-        def y_rects(x: int) -> GeneratorType:
-            """Generates the `x`th column of rectangles."""
-            validate(y_rects, locals())
-
-            display_botleft_x, display_botleft_y = self.rect.bottomleft
-
-            # For each row, a column of rectangles must be generated.
-
-            for y in range(level_length):
-
-                topleft_x = display_botleft_x + self.tile_length*x
-                topleft_y = display_botleft_y - self.tile_length * (y + 1)
-
-                yield Rect(
-                    topleft_x,
-                    topleft_y,
-                    self.tile_length,
-                    self.tile_length
+        self.tile_positions = [
+            (
+                (x, y),
+                (
+                    display_botleft_x + self.tile_length*x,
+                    display_botleft_y - self.tile_length * (y + 1)
                     )
+                )
+            for x in range(level_length)
+            for y in range(level_length)
+            ]
+        # Pairs of the co-ordinates of each tile in the current level
+        # and the position of its top left corner on the screen. The
+        # positions never change, so they are calculated once and
+        # rendered in this order every frame.
+
+        tiles_length = self.tile_length * level_length
+
+        self.tiles_rect = Rect(
+            display_botleft_x,
+            display_botleft_y - tiles_length,
+            tiles_length,
+            tiles_length
+            )
+        # The area of the screen covered by the tiles. All of it is
+        # drawn over every time this display is rendered.
 
-        self.tile_rects = [list(y_rects(x)) for x in range(level_length)]
-        # A grid of rectangles that represent each tile in the current
-        # level.
+        self.rendered_blits = []
+        # The blits that were done in the last render.
 
         self.hover = None
         # The co-ordinates of the tile that the mouse is positioned
@@ -410,39 +565,62 @@ class WorldDisplay:
         # The co-ordinates of the tile that the mouse has clicked, or
         # `None` if a tile has not been clicked.
 
+        self.pressed_this_step = False
+        # Whether the click event occured during the current step.
+
+        self.event_handlers = {
+            pygame.MOUSEMOTION: self.mouse_motion,
+            pygame.MOUSEBUTTONDOWN: self.mouse_button_down
+            }
+        # A map of event types to the methods that handle them.
+
     def check_event(self, event: EventType) -> None:
         """Update this component using `event`."""
-        validate(self.check_event, locals())
 
-        level_length = len(self.world.current_level.tiles)
+        handler = self.event_handlers.get(event.type)
+
+        if handler is not None:
+            handler(event)
+
+    def mouse_motion(self, event: EventType) -> None:
+        """Set `self.hover` using a mouse motion event."""
 
-        # If there is a mouse motion or click event, set `self.hover`
-        # and `self.pressed` to the correct values.
+        self.hover = self.tile_at(event.pos)
 
-        if event.type == pygame.MOUSEMOTION:
+    def mouse_button_down(self, event: EventType) -> None:
+        """Set `self.pressed` using a mouse button event."""
 
-            for x in range(level_length):
-                for y in range(level_length):
+        point = self.tile_at(event.pos)
 
-                    if self.tile_rects[x][y].collidepoint(event.pos):
-                        self.hover = (x, y)
-                        return
+        if event.button == 1 and point is not None:
+            self.pressed = point
+            self.pressed_this_step = True
 
-            self.hover = None
+    def tile_at(self, pos: tuple):
+        """
+        Returns the co-ordinates of the tile at the screen position
+        `pos`, or `None` if there is no tile there.
+        """
 
-        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        level_length = len(self.world.current_level.tiles)
+        display_botleft_x, display_botleft_y = self.rect.bottomleft
+        pos_x, pos_y = pos
+
+        # The tiles form a regular grid, so the tile can be calculated
+        # directly from the position. The y co-ordinates of tiles
+        # increase upwards from the bottom of the display.
 
-            for x in range(level_length):
-                for y in range(level_length):
+        x = (pos_x - display_botleft_x) // self.tile_length
+        y = (display_botleft_y - 1 - pos_y) // self.tile_length
 
-                    if self.tile_rects[x][y].collidepoint(event.pos):
-                        self.pressed = (x, y)
-                        self.pressed_this_step = True
-                        return
+        if 0 <= x < level_length and 0 <= y < level_length:
+            return (x, y)
+
+        else:
+            return None
 
     def step(self, ms_per_step: float) -> None:
         """Step this component by `ms_per_step`."""
-        validate(self.step, locals())
 
         # Only set `self.pressed` to `None` if the click event happened
         # during the last step, not this one.
@@ -454,37 +632,75 @@ class WorldDisplay:
 
             else:
                 self.pressed = None
-                del self.pressed_this_step
 
-    def render(self, surface: Surface) -> None:
-        """Render this display to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this display to the given surface.
 
-        level_length = len(self.world.current_level.tiles)
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        # Render each tile in the level using the appropriate icon. The
+        # blits are collected so they can all be done in a single call.
+
+        # This loop runs for every tile on every frame, so the
+        # attributes it uses are looked up once beforehand.
+
+        tiles = self.world.current_level.tiles
+        icon_rects = self.icon_rects
+        atlas = self.atlas
+        hover_atlas = self.hover_atlas
+        hover = self.hover
 
-        # Render each tile in the level using the appropriate icon.
+        blits = []
+        add_blit = blits.append
 
-        for x in range(level_length):
-            for y in range(level_length):
+        for point, position in self.tile_positions:
 
-                tile = self.world.current_level.tiles[x][y]
-                rect = self.tile_rects[x][y]
+            x, y = point
+            tile = tiles[x][y]
 
-                if tile.entity is not None:
-                    icon = self.icons[tile.entity.icon_name].copy()
-                else:
-                    icon = self.icons[tile.type.name].copy()
+            if tile.entity is not None:
+                area = icon_rects[tile.entity.icon_name]
+            else:
+                area = icon_rects[tile.type.name]
+
+            # If the tile is being hovered over, highlight it.
+
+            if point == hover:
+                add_blit((hover_atlas, position, area))
+
+            else:
+                add_blit((atlas, position, area))
+
+        surface.blits(blits, doreturn=False)
+
+        # Only the tiles that were drawn differently in the last render
+        # have changed. If there was no last render, the whole display
+        # has changed.
 
-                # If the tile is being hovered over, highlight it.
+        if len(blits) != len(self.rendered_blits):
+            dirty_rects = [self.rect]
 
-                if self.hover == (x, y):
-                    colourise(icon, (64, 64, 64))
+        else:
+            tile_size = (self.tile_length, self.tile_length)
+            dirty_rects = []
+
+            for blit, rendered_blit in zip(blits, self.rendered_blits):
 
-                surface.blit(icon, rect)
+                if blit != rendered_blit:
+                    _, position, _ = blit
+                    dirty_rects.append(Rect(position, tile_size))
+
+        self.rendered_blits = blits
+        return dirty_rects
 
 class StatusDisplay:
     """Displays the hero's status."""
 
+    EVENT_TYPES = frozenset()
+    # The types of event that `check_event` responds to.
+
     def __init__(self, pos: tuple, width: float, hero: Hero) -> None:
         """Initialise a new `StatusDisplay` object.
 
@@ -537,13 +753,33 @@ class StatusDisplay:
 
         self.hero = hero
 
+        self.last_stats = None
+        # The hero's stats when the labels were last updated.
+
     def check_event(self, event: EventType) -> None:
         """Check `event` with this element."""
-        validate(self.check_event, locals())
 
     def step(self, ms_per_step: float) -> None:
         """Update this element."""
-        validate(self.step, locals())
+
+        stats = (
+            self.hero.name,
+            self.hero.score,
+            self.hero.level,
+            self.hero.hit_points,
+            self.hero.max_hit_points,
+            self.hero.defence,
+            self.hero.speed,
+            self.hero.strength
+            )
+
+        # The labels only need to be updated if the hero's stats have
+        # changed since the last step.
+
+        if stats == self.last_stats:
+            return
+
+        self.last_stats = stats
 
         self.name_label.text = self.hero.name
         self.score_label.text = 'Score: {}'.format(self.hero.score)
@@ -556,16 +792,26 @@ class StatusDisplay:
         self.speed_label.text = 'Speed: {}'.format(self.hero.speed)
         self.strength_label.text = 'Strength: {}'.format(self.hero.strength)
 
-    def render(self, surface: Surface) -> None:
-        """Render this element to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this element to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
 
 class MessageDisplay:
     """Displays game messages."""
 
+    EVENT_TYPES = frozenset()
+    # The types of event that `check_event` responds to.
+
     def __init__(self, pos: tuple, width: float, height: float) -> None:
         """Initialise a new `MessageDisplay` object.
 
@@ -580,12 +826,12 @@ class MessageDisplay:
 
         surface_w, surface_h = pygame.display.get_surface().get_size()
         pos_x, pos_y = pos
-        self.left_pos = pos_x - width/2
+        left_pos = pos_x - width/2
         top_pos = pos_y - height/2
 
         self.messages = []
         line_height = height*0.03
-        self.font_height = line_height*0.8
+        font_height = line_height*0.8
 
         # Because a message may be of an arbitrary length, there must
         # be a mechanism that wraps the text and displays it on
@@ -593,78 +839,106 @@ class MessageDisplay:
 
         # A monospace font family must be used because a constant
         # character width is required.
-        font = Font(
-            pygame.font.match_font('mono'),
-            int(surface_h * self.font_height)
-            )
+        self.font = load_font('mono', int(surface_h * font_height))
 
-        font_px_width, _ = font.size('a')
+        font_px_width, _ = self.font.size('a')
         self.chars_per_line = int(surface_w * width / font_px_width)
         self.lines = int(surface_h * height / (surface_h * line_height))
 
-        # The possible y positions for labels must be saved for use
-        # in the render function.
+        # The position of the middle of the left side of each line must
+        # be saved for use in the render function.
 
-        self.y_positions = list(
-            xrange(
+        self.line_positions = [
+            (surface_w * left_pos, surface_h * y)
+            for y in xrange(
                 top_pos + line_height/2,
                 top_pos + line_height*self.lines,
                 line_height
                 )
+            ]
+
+        self.font_renders = {}
+        # A map of the lines rendered in the last frame, paired with
+        # their colours, to the surfaces they were rendered to.
+
+        self.rect = Rect(
+            surface_w * left_pos,
+            surface_h * top_pos,
+            surface_w * width,
+            surface_h * height
             )
+        # The area of the screen that the messages are displayed in.
+
+        self.rendered_lines = None
+        # The lines and their colours in the order they were last
+        # rendered.
 
     def add_message(self, msg: str) -> None:
         """Add a message to the end of the message list."""
         validate(self.add_message, locals())
-        self.messages.append(msg)
+
+        # Any messages that are over the character limit must be split
+        # onto multiple lines.
+        self.messages.extend(textwrap.wrap(msg, width=self.chars_per_line))
+
+        # If there are too many lines of messages, remove the ones at
+        # the beginning of the list.
+        del self.messages[:-self.lines]
 
     def check_event(self, event: EventType) -> None:
         """Check `event` with this element."""
-        validate(self.check_event, locals())
 
     def step(self, ms_per_step: float) -> None:
         """Update this element."""
-        validate(self.step, locals())
-
-    def render(self, surface: Surface) -> None:
-        """Render this element to the given surface."""
-        validate(self.render, locals())
 
-        # Any messages that are over the character limit must be split
-        # onto multiple lines.
-        self.messages = [
-            str_
-            for msg in self.messages
-            for str_ in textwrap.wrap(msg, width=self.chars_per_line)
-            ]
+    def render(self, surface: Surface) -> list:
+        """Render this element to the given surface.
 
-        # If there are too many lines of messages, remove the ones at
-        # the beginning of the list.
-        while len(self.messages) > self.lines:
-            del self.messages[0]
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
 
         # The colour of each line must be toggled between white and
         # grey to allow each line to be more easily distinguished.
 
         colours = itertools.cycle([(255, 255, 255), (190, 190, 190)])
-        seq = zip(self.messages, self.y_positions, colours)
+        seq = zip(self.messages, self.line_positions, colours)
 
-        for msg, y_pos, colour in seq:
+        # Lines that are shown with the same colour as in the last frame
+        # do not need to be rendered again.
 
-            label = Label(
-                pos=(self.left_pos, y_pos),
-                height=self.font_height,
-                text=msg,
-                font_type='mono',
-                alignment='left',
-                colour=colour
-                )
+        font_renders = {}
+        lines = []
+
+        for msg, (x, y), colour in seq:
+
+            font_render = self.font_renders.get((msg, colour))
+
+            if font_render is None:
+                font_render = self.font.render(msg, True, colour)
+
+            font_renders[(msg, colour)] = font_render
+            lines.append((msg, colour))
+            surface.blit(font_render, (x, y - font_render.get_height() / 2))
+
+        self.font_renders = font_renders
 
-            label.render(surface)
+        # When a message is added, every line moves up, so the whole
+        # display has changed.
+
+        if lines != self.rendered_lines:
+            self.rendered_lines = lines
+            return [self.rect]
+
+        else:
+            return []
 
 class ScoreDisplay:
     """Displays a character's score."""
 
+    EVENT_TYPES = frozenset()
+    # The types of event that `check_event` responds to.
+
     def __init__(self, pos: tuple, height: float, score: Score) -> None:
         """Initialise a new `ScoreDisplay` object.
 
@@ -716,22 +990,30 @@ class ScoreDisplay:
 
     def check_event(self, event: EventType) -> None:
         """Check `event` with this element."""
-        validate(self.check_event, locals())
 
     def step(self, ms_per_step: float) -> None:
         """Update this element."""
-        validate(self.step, locals())
 
-    def render(self, surface: Surface) -> None:
-        """Render this label to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this label to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
 
 class ResolutionDisplay:
     """Displays the resolution and provides controls to chage it."""
 
+    EVENT_TYPES = Button.EVENT_TYPES
+    # The types of event that `check_event` responds to.
+
     def __init__(self, pos: tuple, height: float) -> None:
         """Initialise a new `ResolutionDisplay` object.
 
@@ -780,12 +1062,11 @@ class ResolutionDisplay:
         """
         Update this component using `res`. Returns the new resolution.
         """
-        validate(self.res_update, locals())
 
         # If either button has been pressed, get the appropriate
         # resolution. Otherwise keep the current one.
 
-        res_index = RESOLUTIONS.index(res)
+        res_index = RESOLUTION_INDICES[res]
 
         if self.left_button.pressed:
             res_index = min_clamp(res_index - 1, 0)
@@ -800,28 +1081,36 @@ class ResolutionDisplay:
 
     def check_event(self, event: EventType) -> None:
         """Check `event` with this element."""
-        validate(self.check_event, locals())
 
         for c in self.components:
             c.check_event(event)
 
     def step(self, ms_per_step: float) -> None:
         """Update this element."""
-        validate(self.step, locals())
 
         for c in self.components:
             c.step(ms_per_step)
 
-    def render(self, surface: Surface) -> None:
-        """Render this label to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this label to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
 
 class VolumeDisplay:
     """Displays the volume and provides controls to change it."""
 
+    EVENT_TYPES = Button.EVENT_TYPES
+    # The types of event that `check_event` responds to.
+
     def __init__(self, pos: tuple, height: float) -> None:
         """Initialise a new `VolumeDisplay` object.
 
@@ -857,6 +1146,9 @@ class VolumeDisplay:
 
         self.components = [self.left_button, self.right_button]
 
+        self.rendered_bars = None
+        # The number of bars that were last rendered.
+
         # Generate a list of rectangles that represent the current
         # volume, depending on which rectangles are rendered.
         self.rects = [
@@ -877,7 +1169,6 @@ class VolumeDisplay:
         """
         Update this component using `volume`. Returns the new volume.
         """
-        validate(self.vol_update, locals())
 
         if self.left_button.pressed:
             volume = min_clamp(volume-0.1, 0.0)
@@ -890,28 +1181,118 @@ class VolumeDisplay:
 
     def check_event(self, event: EventType) -> None:
         """Check `event` with this element."""
-        validate(self.check_event, locals())
 
         for c in self.components:
             c.check_event(event)
 
     def step(self, ms_per_step: float) -> None:
         """Update this element."""
-        validate(self.step, locals())
 
         for c in self.components:
             c.step(ms_per_step)
 
-    def render(self, surface: Surface) -> None:
-        """Render this label to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this label to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
 
         for x in range(self.bars):
             surface.fill((255, 255, 255), self.rects[x])
 
+        # If the number of bars has changed, the area that contains all
+        # of the bars has changed.
+
+        if self.bars != self.rendered_bars:
+            self.rendered_bars = self.bars
+            dirty_rects.append(self.rects[0].unionall(self.rects))
+
+        return dirty_rects
+
+def load_font(font_type: str, size: int) -> Font:
+    """Returns a `Font` of the given font family and size.
+
+    Searching for font files and parsing them is slow, so both the
+    font file paths and the `Font` objects are cached.
+    """
+    validate(load_font, locals())
+
+    # `pygame.font.match_font` returns `None` if no matching font is
+    # found, so membership must be checked instead of the value.
+
+    if font_type not in font_paths:
+        font_paths[font_type] = pygame.font.match_font(font_type)
+
+    path = font_paths[font_type]
+
+    font = fonts.get((path, size))
+
+    if font is None:
+        font = Font(path, size)
+        fonts[(path, size)] = font
+
+    return font
+
+def make_icon_atlases(tile_length: int) -> tuple:
+    """
+    Returns the icon atlas, a highlighted copy of it and a map of
+    icon names to the areas of the atlases that contain them.
+
+    Each icon in the icons directory is scaled to `tile_length`.
+    """
+    validate(make_icon_atlases, locals())
+
+    def icon_entries() -> GeneratorType:
+        """Generates pairs of names and tile icons."""
+
+        icon_dir = os.path.join(get_maindir(), 'data', 'icons')
+
+        # All of the image files in the icons directory must be
+        # loaded into a map of icon names to `Surface` objects.
+
+        for file in os.listdir(icon_dir):
+
+            _, ext = os.path.splitext(file)
+
+            if ext.lower() == '.png':
+
+                full_path = os.path.join(icon_dir, file)
+                name = raw_filename(file)
+
+                icon = pygame.transform.scale(
+                    pygame.image.load(full_path).convert_alpha(),
+                    (tile_length, tile_length)
+                    )
+
+                yield name, icon
+
+    icons = list(icon_entries())
+
+    # All of the icons are drawn side by side onto a single atlas
+    # surface. Each tile is rendered by blitting the area of the
+    # atlas that contains its icon.
+
+    atlas = Surface((tile_length * len(icons), tile_length))
+    icon_rects = {}
+
+    for i, (name, icon) in enumerate(icons):
+
+        area = Rect(tile_length * i, 0, tile_length, tile_length)
+
+        atlas.blit(icon, area)
+        icon_rects[name] = area
+
+    atlas = atlas.convert()
+    hover_atlas = colourise(atlas.copy(), (64, 64, 64))
+
+    return atlas, hover_atlas, icon_rects
+
 def colourise(surface: Surface, rgb: tuple) -> Surface:
     """
     Returns the same surface with an rgb value added to all the pixels
@@ -919,17 +1300,19 @@ def colourise(surface: Surface, rgb: tuple) -> Surface:
     """
     validate(colourise, locals())
 
-    r, g, b = rgb
-    pixels = PixelArray(surface)
+    # Filling with a blend flag adds or subtracts the colour from every
+    # pixel in one call, clamping each channel between 0 and 255.
+    # Positive and negative components must be applied separately.
+    # Each fill locks the surface and passes over every pixel, so a
+    # fill that would not change anything is skipped.
 
-    for x in range(surface.get_width()):
-        for y in range(surface.get_height()):
+    add_rgb = tuple(max(c, 0) for c in rgb)
+    sub_rgb = tuple(max(-c, 0) for c in rgb)
 
-            px_colour = surface.unmap_rgb(pixels[x][y])
-            new_r = clamp(px_colour.r + r, 0, 255)
-            new_g = clamp(px_colour.g + g, 0, 255)
-            new_b = clamp(px_colour.b + b, 0, 255)
+    if any(add_rgb):
+        surface.fill(add_rgb, special_flags=pygame.BLEND_RGB_ADD)
 
-            pixels[x][y] = (new_r, new_g, new_b)
+    if any(sub_rgb):
+        surface.fill(sub_rgb, special_flags=pygame.BLEND_RGB_SUB)
 
-    return pixels.surface
+    return surface
@@ -1,5 +1,5 @@
 import os
-import pickle
+from concurrent.futures import ThreadPoolExecutor
 
 import pygame
 
@@ -8,7 +8,7 @@ from renethack.config import Config
 from renethack.state import MainMenu
 from renethack.util import get_maindir, get_millitime
 
-config_path = os.path.join(get_maindir(), 'config.pickle')
+config_path = os.path.join(get_maindir(), 'config.dat')
 # The path to the config file.
 
 music_path = os.path.join(get_maindir(), 'data', 'music', 'Adventure Meme.ogg')
@@ -17,6 +17,25 @@ music_path = os.path.join(get_maindir(), 'data', 'music', 'Adventure Meme.ogg')
 MS_PER_STEP = 1000.0 / 80.0
 # How many milliseconds the simulation is updated by each step.
 
+MAX_FPS = 60
+# The maximum number of times per second that the screen is rendered.
+
+MAX_LAG = 250.0
+# The maximum amount of milliseconds that the simulation will be
+# updated by before rendering again.
+
+RENDER_BUDGET = 12.0
+# If updating the state takes more than this many milliseconds in one
+# iteration, rendering is skipped for that iteration.
+
+INACTIVE_WAIT = 50
+# How many milliseconds the main loop waits each iteration while the
+# window is not visible.
+
+IDLE_WAIT = 100
+# The maximum amount of milliseconds that the main loop waits for an
+# event while the state has nothing to update.
+
 def start() -> None:
     """The top level function of the game.
 
@@ -26,8 +45,12 @@ def start() -> None:
 
     pygame.init()
     pygame.key.set_repeat(500, 10)
-    pygame.mixer.music.load(music_path)
-    pygame.mixer.music.play(-1)
+
+    # The music is decoded into memory once, rather than being
+    # streamed from the disk while it plays.
+
+    music = pygame.mixer.Sound(music_path)
+    music.play(loops=-1)
 
     default_config = Config(
         fullscreen=False,
@@ -35,17 +58,27 @@ def start() -> None:
         volume=0.7
         )
 
-    # If the config file does not exist, use the default config.
+    # If the config file does not exist or cannot be read, use the
+    # default config.
+    config = renethack.config.load(config_path, default_config)
 
-    if not os.path.exists(config_path):
-        with open(config_path, mode='wb') as file:
-            pickle.dump(default_config, file)
+    surface = renethack.config.apply(config, music)
 
-    with open(config_path, mode='rb') as file:
-        config = pickle.load(file)
+    config_writer = ThreadPoolExecutor(max_workers=1)
+    # Writes config files without blocking the main loop.
 
-    surface = renethack.config.apply(config)
     state = MainMenu()
+    step = state.step
+    render = state.render
+    clock = pygame.time.Clock()
+    start_time = get_millitime()
+
+    rendered_state = None
+    # The state that was rendered in the last iteration.
+
+    dropped_frame = False
+    # Whether rendering was skipped in the last iteration because
+    # updating the state took too long.
 
     elapsed = 0.0
     # The amount of milliseconds that the last iteration took.
@@ -54,42 +87,144 @@ def start() -> None:
     # The amount of milliseconds that the simulation
     # needs to be updated by.
 
+    events = []
+    # The events that have not been passed to the state yet.
+
     # The main loop should always try to keep up with the real world
     # and only render when there is leftover time to do so.
 
     while True:
-        start_time = get_millitime()
 
         # `lag` must be set to the new time that needs to be processed.
         lag += elapsed
 
+        # If the state only changes in response to events and it has
+        # already been rendered with no changes since, updating it
+        # before the next event would do nothing. Instead, the loop
+        # waits for an event, letting the process sleep.
+
+        if (state.INPUT_DRIVEN
+                and not state.changed
+                and state is rendered_state
+                and not events):
+
+            event = pygame.event.wait(IDLE_WAIT)
+
+            if event.type != pygame.NOEVENT:
+                events.append(event)
+
+            # The time spent waiting must still be simulated, but it
+            # must not count towards the time taken to update the
+            # state, or the frame responding to the event would be
+            # dropped.
+
+            end_time = get_millitime()
+            lag += end_time - start_time
+            start_time = end_time
+
+        # The event queue is read once per iteration. All the new
+        # events are passed to the next step, so later steps in the
+        # same iteration are given none.
+        events.extend(pygame.event.get())
+
+        # After a long stall, catching up completely would take so many
+        # steps that the next iteration would fall even further behind.
+        # Instead, the simulation is allowed to lose some time.
+
+        if lag > MAX_LAG:
+            lag = MAX_LAG
+
+        stepped = False
+        # Whether the state has been updated in this iteration.
+
         # The state must be updated until it catches up with the real
         # world.
 
         while lag >= MS_PER_STEP:
 
-            state = state.step(MS_PER_STEP, config)
+            next_state = step(MS_PER_STEP, config, events)
+            events = []
             lag -= MS_PER_STEP
+            stepped = True
+
+            # Most steps return the same state, in which case there is
+            # nothing else to do.
+
+            if next_state is state:
+                continue
 
-            # If the state has exited, `state` will be `None`. If the
-            # config needs to be changed, `state` will be a pair of
-            # a function returning the new state and the new config.
+            # If the state has exited, `next_state` will be `None`. If
+            # the config needs to be changed, `next_state` will be a
+            # pair of a function returning the new state and the new
+            # config.
 
-            if state is None:
+            if next_state is None:
+
+                # Any config that has not been written yet must be
+                # written before exiting.
+                config_writer.shutdown(wait=True)
                 return
 
-            elif isinstance(state, tuple):
-                state_fn, config = state
+            elif isinstance(next_state, tuple):
+                state_fn, config = next_state
+                config_writer.submit(
+                    renethack.config.save, config_path, config)
+
+                surface = renethack.config.apply(config, music)
+                next_state = state_fn()
+
+            # The state has changed, so its methods must be looked up
+            # again.
+
+            state = next_state
+            step = state.step
+            render = state.render
 
-                with open(config_path, mode='wb') as file:
-                    pickle.dump(config, file)
+        # If updating the state took too long, rendering now would make
+        # the next iteration fall behind as well, so the frame is
+        # dropped. Frames are never dropped twice in a row, so that the
+        # screen is still updated on a slow computer.
 
-                surface = renethack.config.apply(config)
-                state = state_fn()
+        dropped_frame = (
+            get_millitime() - start_time > RENDER_BUDGET
+            and not dropped_frame
+            )
 
-        state.render(surface)
-        pygame.display.flip()
+        # If the window is minimized or hidden, nothing that is
+        # rendered can be seen, so rendering is skipped and the loop
+        # waits longer before continuing. The whole screen must be
+        # updated once the window is visible again. If the state has
+        # not been updated, it would render exactly the same as last
+        # time, so rendering is also skipped.
+
+        if not pygame.display.get_active():
+            rendered_state = None
+            pygame.time.wait(INACTIVE_WAIT)
+
+        elif stepped and not dropped_frame:
+
+            dirty_rects = render(surface)
+
+            # Only the areas of the screen that the state has changed
+            # need to be updated, unless a different state was rendered
+            # last time.
+
+            if state is rendered_state:
+                pygame.display.update(dirty_rects)
+
+            else:
+                pygame.display.flip()
+                rendered_state = state
+
+        # `clock.tick` waits if necessary so that the loop does not run
+        # more than `MAX_FPS` times per second, rather than using all
+        # of the CPU time it can.
+        clock.tick(MAX_FPS)
 
         # `elapsed` must be set to the amount of time that this
-        # iteration took.
-        elapsed = abs(get_millitime() - start_time)
+        # iteration took. The time returned by `clock.tick` is rounded
+        # to a whole millisecond, so it is measured separately.
+
+        end_time = get_millitime()
+        elapsed = end_time - start_time
+        start_time = end_time
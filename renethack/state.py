@@ -1,13 +1,15 @@
 import os
-import pickle
+import struct
+from concurrent.futures import ThreadPoolExecutor
 
 import pygame
-from pygame import Surface
+from pygame import Surface, Rect
 
 import renethack
 from renethack.config import Config
 from renethack.gui import Label, Button, Image, TextBox, WorldDisplay, StatusDisplay, MessageDisplay, ScoreDisplay, ResolutionDisplay, VolumeDisplay
 from renethack.entity_types import Hero, Score
+from renethack.world_types import World
 from renethack.util import validate, xrange, get_maindir
 
 LEVELS = 10
@@ -16,9 +18,43 @@ LEVELS = 10
 LEVEL_LENGTH = 30
 # The length of each side of a level.
 
-scores_path = os.path.join(get_maindir(), 'scores.pickle')
+scores_path = os.path.join(get_maindir(), 'scores.dat')
 # The path to the scores file.
 
+SCORE_COUNT_FORMAT = struct.Struct('<B')
+# The binary layout of the number of scores at the start of a scores
+# file.
+
+SCORE_FORMAT = struct.Struct('<Hii')
+# The binary layout of each score in a scores file: the length of the
+# name in bytes, the level and the score. The UTF-8 encoded name
+# follows each score.
+
+icon_paths = {
+    name: os.path.join(get_maindir(), 'data', 'icons', '{}.png'.format(name))
+    for name in (
+        'Floor',
+        'Goblin',
+        'Open door',
+        'Upwards stairway',
+        'Hero',
+        'Dragon'
+        )
+    }
+# A map of the names of the icons shown on the how to play screen to
+# their paths.
+
+world_generator = ThreadPoolExecutor(max_workers=1)
+# Generates the world for a new game in the background while the
+# player enters their name.
+
+scores_writer = ThreadPoolExecutor(max_workers=1)
+# Writes the score file without blocking the main loop.
+
+loaded_scores = {}
+# A map of score file paths to the list of scores in them, so that the
+# score file is only read once.
+
 class MainMenu:
     """The main menu of the game.
 
@@ -27,6 +63,10 @@ class MainMenu:
     in the bottom left corner.
     """
 
+    INPUT_DRIVEN = True
+    # Whether this state only changes in response to events, in which
+    # case it must have a `changed` attribute.
+
     def __init__(self) -> None:
         """Initialise a new `MainMenu` object."""
 
@@ -146,21 +186,28 @@ class MainMenu:
                 )
             )
 
-    def step(self, ms_per_step: float, config: Config):
+        self.event_targets = event_targets(self.components)
+        # A map of event types to the components that respond to them.
+
+        self.changed = True
+        # Whether this state may render differently than it did last
+        # time.
+
+    def step(self, ms_per_step: float, config: Config, events: list):
         """Update this main menu state."""
-        validate(self.step, locals())
 
-        # Each state class is responsible for passing any queued events
-        # to its components and updating its components.
+        # Each state class is responsible for passing the events given
+        # to it to its components and updating its components.
 
-        for event in pygame.event.get():
+        for event in events:
 
             if event.type == pygame.QUIT:
                 return None
 
             else:
-                for c in self.components:
+                for c in self.event_targets.get(event.type, ()):
                     c.check_event(event)
+                    self.changed = True
 
         for c in self.components:
             c.step(ms_per_step)
@@ -186,17 +233,31 @@ class MainMenu:
         else:
             return self
 
-    def render(self, surface: Surface) -> None:
-        """Render this main menu to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this main menu to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        # Components only change when they are given an event, so if
+        # none have been, nothing needs to be rendered.
+
+        if not self.changed:
+            return []
+
+        self.changed = False
 
         # Before rendering each component, the screen must be cleared
         # to black.
 
         surface.fill((0, 0, 0))
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
 
 class NewGame:
     """The state that shows when a new game is to be started.
@@ -205,10 +266,19 @@ class NewGame:
     enter key starts the game.
     """
 
+    INPUT_DRIVEN = True
+    # Whether this state only changes in response to events, in which
+    # case it must have a `changed` attribute.
+
     def __init__(self) -> None:
         """Initialise a new `NewGame` object."""
         validate(self.__init__, locals())
 
+        self.world_future = world_generator.submit(new_world)
+        # The world for the new game. Generating it takes a noticeable
+        # amount of time, so it is done while the player enters their
+        # name.
+
         self.back_button = Button(
             pos=(0.1, 0.1),
             width=0.16,
@@ -230,49 +300,79 @@ class NewGame:
                 )
             )
 
-    def step(self, ms_per_step: float, config: Config):
+        self.event_targets = event_targets(self.components)
+        # A map of event types to the components that respond to them.
+
+        self.changed = True
+        # Whether this state may render differently than it did last
+        # time.
+
+    def step(self, ms_per_step: float, config: Config, events: list):
         """Update this state."""
-        validate(self.step, locals())
 
-        # Each state class is responsible for passing any queued events
-        # to its components and updating its components.
+        # Each state class is responsible for passing the events given
+        # to it to its components and updating its components.
 
-        for event in pygame.event.get():
+        for event in events:
 
             # If the enter key has been pressed, return a new
             # `MainGame` state using the name currently in the text
-            # box.
+            # box. If the world has not finished generating yet, this
+            # waits for it.
 
             if event.type == pygame.QUIT:
+                self.world_future.cancel()
                 return None
 
             elif event.type == pygame.KEYDOWN:
 
                 if event.key == pygame.K_RETURN:
-                    return MainGame(self.text_box.get_text())
+                    return MainGame(
+                        self.text_box.get_text(),
+                        self.world_future.result()
+                        )
 
-            for c in self.components:
+            for c in self.event_targets.get(event.type, ()):
                 c.check_event(event)
+                self.changed = True
 
         for c in self.components:
             c.step(ms_per_step)
 
+        # If the world is no longer needed, it must not be generated,
+        # so that it does not delay the next world or exiting.
+
         if self.back_button.pressed:
+            self.world_future.cancel()
             return MainMenu()
 
         return self
 
-    def render(self, surface: Surface) -> None:
-        """Render this state to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this state to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        # Components only change when they are given an event, so if
+        # none have been, nothing needs to be rendered.
+
+        if not self.changed:
+            return []
+
+        self.changed = False
 
         # Before rendering each component, the screen must be cleared
         # to black.
 
         surface.fill((0, 0, 0))
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
 
 class MainGame:
     """The state where the main game is played.
@@ -283,18 +383,24 @@ class MainGame:
     character's stats are also shown to the sides of the screen.
     """
 
-    def __init__(self, name: str) -> None:
-        """Initialise this object to its default state."""
+    INPUT_DRIVEN = False
+    # Whether this state only changes in response to events, in which
+    # case it must have a `changed` attribute.
+
+    def __init__(self, name: str, world: World) -> None:
+        """Initialise this object to its default state.
+
+        name: the name of the hero.
+        world: a world returned by `new_world`.
+        """
         validate(self.__init__, locals())
 
         self.score_saved = False
-        self.hero = renethack.entity.rand_hero(name)
+        self.world = world
 
-        self.world = renethack.world.make_world(
-            levels=LEVELS,
-            level_length=LEVEL_LENGTH,
-            hero=self.hero
-            )
+        hero_x, hero_y = world.hero
+        self.hero = world.current_level.tiles[hero_x][hero_y].entity
+        self.hero.name = name
 
         self.world_display = WorldDisplay(
             pos=(0.5, 0.5),
@@ -330,16 +436,41 @@ class MainGame:
                 )
             )
 
-    def step(self, ms_per_step: float, config: Config):
+        self.event_targets = event_targets(self.components)
+        # A map of event types to the components that respond to them.
+
+        surface_w, surface_h = pygame.display.get_surface().get_size()
+        tiles_rect = self.world_display.tiles_rect
+
+        self.background_rects = [
+            Rect(0, 0, tiles_rect.left, surface_h),
+            Rect(tiles_rect.right, 0, surface_w - tiles_rect.right, surface_h),
+            Rect(tiles_rect.left, 0, tiles_rect.width, tiles_rect.top),
+            Rect(
+                tiles_rect.left,
+                tiles_rect.bottom,
+                tiles_rect.width,
+                surface_h - tiles_rect.bottom
+                )
+            ]
+        # The areas of the screen to the left of, to the right of, above
+        # and below the world display's tiles. The tiles are drawn over
+        # completely every frame, so only these areas need to be
+        # cleared before rendering.
+
+    def step(self, ms_per_step: float, config: Config, events: list):
         """Step the game state."""
-        validate(self.step, locals())
 
-        # Each state class is responsible for passing any queued events
-        # to its components and updating its components.
+        # This method runs every step, so the hero is looked up once.
+        hero = self.hero
 
-        for event in pygame.event.get():
+        # Each state class is responsible for passing the events given
+        # to it to its components and updating its components.
+
+        for event in events:
 
             # If the space key has been pressed, make the hero wait.
+            # Key events must still be passed to the components.
 
             if event.type == pygame.QUIT:
                 return None
@@ -347,12 +478,10 @@ class MainGame:
             elif event.type == pygame.KEYDOWN:
 
                 if event.key == pygame.K_SPACE:
-                    self.hero.wait()
-
-            else:
+                    hero.wait()
 
-                for c in self.components:
-                    c.check_event(event)
+            for c in self.event_targets.get(event.type, ()):
+                c.check_event(event)
 
         for c in self.components:
             c.step(ms_per_step)
@@ -364,18 +493,20 @@ class MainGame:
 
             return MainMenu()
 
-        for msg in self.hero.collect_messages():
+        for msg in hero.collect_messages():
             self.message_display.add_message(msg)
 
-        if self.hero.hit_points > 0:
+        if hero.hit_points > 0:
 
-            if self.world_display.pressed is not None:
-                self.hero.path_to(self.world, self.world_display.pressed)
+            pressed = self.world_display.pressed
+
+            if pressed is not None:
+                hero.path_to(self.world, pressed)
 
             # The world must only be updated if the hero has less than
             # 100 energy or the hero has actions queued.
 
-            if self.hero.energy < 100 or len(self.hero.actions) > 0:
+            if hero.energy < 100 or hero.actions:
                 renethack.world.step(self.world)
 
         elif not self.score_saved:
@@ -388,6 +519,13 @@ class MainGame:
         self.score_saved = True
         scores = load_scores()
 
+        # The saved scores are already sorted, so if there are three of
+        # them and the new score is not higher than the lowest, the new
+        # score would not be kept and nothing needs to be written.
+
+        if len(scores) >= 3 and self.hero.score <= scores[-1].score:
+            return
+
         scores.append(
             Score(
                 name=self.hero.name,
@@ -399,20 +537,31 @@ class MainGame:
         scores.sort(key=lambda s: s.score, reverse=True)
         scores = scores[:3]
 
-        with open(scores_path, 'wb') as file:
-            pickle.dump(scores, file)
+        # The cached scores are updated immediately, so the new score
+        # is shown even if the file has not been written yet.
+
+        loaded_scores[scores_path] = scores
+        scores_writer.submit(write_scores, scores)
+
+    def render(self, surface: Surface) -> list:
+        """Render the current game state.
 
-    def render(self, surface: Surface) -> None:
-        """Render the current game state."""
-        validate(self.render, locals())
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
 
         # Before rendering each component, the screen must be cleared
-        # to black.
+        # to black, apart from the area that the world display's tiles
+        # cover.
 
-        surface.fill((0, 0, 0))
+        for rect in self.background_rects:
+            surface.fill((0, 0, 0), rect)
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
 
 class HowToPlay:
     """The state that shows instructions for the game.
@@ -421,6 +570,10 @@ class HowToPlay:
     associated image.
     """
 
+    INPUT_DRIVEN = True
+    # Whether this state only changes in response to events, in which
+    # case it must have a `changed` attribute.
+
     def __init__(self) -> None:
         """Initialise this state."""
 
@@ -453,14 +606,6 @@ class HowToPlay:
         image_height = text_height*1.4
         y_positions = list(xrange(0.25, 1, text_height*1.8))
 
-        def icon(name):
-            return os.path.join(
-                get_maindir(),
-                'data',
-                'icons',
-                '{}.png'.format(name)
-                )
-
         self.components.append(
             Label(
                 pos=(0.03, y_positions[0]),
@@ -474,7 +619,7 @@ class HowToPlay:
 
         self.components.append(
             Image(
-                filename=icon('Floor'),
+                filename=icon_paths['Floor'],
                 pos=(0.95, y_positions[0]),
                 height=image_height
                 )
@@ -493,7 +638,7 @@ class HowToPlay:
 
         self.components.append(
             Image(
-                filename=icon('Goblin'),
+                filename=icon_paths['Goblin'],
                 pos=(0.95, y_positions[1]),
                 height=image_height
                 )
@@ -512,7 +657,7 @@ class HowToPlay:
 
         self.components.append(
             Image(
-                filename=icon('Open door'),
+                filename=icon_paths['Open door'],
                 pos=(0.95, y_positions[2]),
                 height=image_height
                 )
@@ -531,7 +676,7 @@ class HowToPlay:
 
         self.components.append(
             Image(
-                filename=icon('Upwards stairway'),
+                filename=icon_paths['Upwards stairway'],
                 pos=(0.95, y_positions[3]),
                 height=image_height
                 )
@@ -550,7 +695,7 @@ class HowToPlay:
 
         self.components.append(
             Image(
-                filename=icon('Hero'),
+                filename=icon_paths['Hero'],
                 pos=(0.95, y_positions[4]),
                 height=image_height
                 )
@@ -580,28 +725,35 @@ class HowToPlay:
 
         self.components.append(
             Image(
-                filename=icon('Dragon'),
+                filename=icon_paths['Dragon'],
                 pos=(0.95, y_positions[6]),
                 height=image_height
                 )
             )
 
-    def step(self, ms_per_step: float, config: Config):
+        self.event_targets = event_targets(self.components)
+        # A map of event types to the components that respond to them.
+
+        self.changed = True
+        # Whether this state may render differently than it did last
+        # time.
+
+    def step(self, ms_per_step: float, config: Config, events: list):
         """Update this state."""
-        validate(self.step, locals())
 
-        # Each state class is responsible for passing any queued events
-        # to its components and updating its components.
+        # Each state class is responsible for passing the events given
+        # to it to its components and updating its components.
 
-        for event in pygame.event.get():
+        for event in events:
 
             if event.type == pygame.QUIT:
                 return None
 
             else:
 
-                for c in self.components:
+                for c in self.event_targets.get(event.type, ()):
                     c.check_event(event)
+                    self.changed = True
 
         for c in self.components:
             c.step(ms_per_step)
@@ -611,17 +763,31 @@ class HowToPlay:
 
         return self
 
-    def render(self, surface: Surface) -> None:
-        """Render this state to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this state to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        # Components only change when they are given an event, so if
+        # none have been, nothing needs to be rendered.
+
+        if not self.changed:
+            return []
+
+        self.changed = False
 
         # Before rendering each component, the screen must be cleared
         # to black.
 
         surface.fill((0, 0, 0))
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
 
 class HighScores:
     """The state that shows the high scores from the scores file.
@@ -630,6 +796,10 @@ class HighScores:
     If the scores file does not exist, no scores are shown.
     """
 
+    INPUT_DRIVEN = True
+    # Whether this state only changes in response to events, in which
+    # case it must have a `changed` attribute.
+
     def __init__(self) -> None:
         """Initialise this state."""
 
@@ -678,22 +848,29 @@ class HighScores:
                     )
                 )
 
-    def step(self, ms_per_step: float, config: Config):
+        self.event_targets = event_targets(self.components)
+        # A map of event types to the components that respond to them.
+
+        self.changed = True
+        # Whether this state may render differently than it did last
+        # time.
+
+    def step(self, ms_per_step: float, config: Config, events: list):
         """Update this state."""
-        validate(self.step, locals())
 
-        # Each state class is responsible for passing any queued events
-        # to its components and updating its components.
+        # Each state class is responsible for passing the events given
+        # to it to its components and updating its components.
 
-        for event in pygame.event.get():
+        for event in events:
 
             if event.type == pygame.QUIT:
                 return None
 
             else:
 
-                for c in self.components:
+                for c in self.event_targets.get(event.type, ()):
                     c.check_event(event)
+                    self.changed = True
 
         for c in self.components:
             c.step(ms_per_step)
@@ -703,17 +880,31 @@ class HighScores:
 
         return self
 
-    def render(self, surface: Surface) -> None:
-        """Render this state to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this state to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        # Components only change when they are given an event, so if
+        # none have been, nothing needs to be rendered.
+
+        if not self.changed:
+            return []
+
+        self.changed = False
 
         # Before rendering each component, the screen must be cleared
         # to black.
 
         surface.fill((0, 0, 0))
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
 
 class Options:
     """
@@ -725,6 +916,10 @@ class Options:
     changes they make.
     """
 
+    INPUT_DRIVEN = True
+    # Whether this state only changes in response to events, in which
+    # case it must have a `changed` attribute.
+
     def __init__(self) -> None:
         """Initialise this state."""
 
@@ -815,25 +1010,36 @@ class Options:
                 )
             )
 
-    def step(self, ms_per_step: float, config: Config):
+        self.event_targets = event_targets(self.components)
+        # A map of event types to the components that respond to them.
+
+        self.changed = True
+        # Whether this state may render differently than it did last
+        # time.
+
+    def step(self, ms_per_step: float, config: Config, events: list):
         """Update this state."""
-        validate(self.step, locals())
 
-        # Each state class is responsible for passing any queued events
-        # to its components and updating its components.
+        # Each state class is responsible for passing the events given
+        # to it to its components and updating its components.
+
+        # The controls are first set from the config in this step,
+        # without any event, so they must be rendered again.
 
         if self.config is None:
             self.config = config
+            self.changed = True
 
-        for event in pygame.event.get():
+        for event in events:
 
             if event.type == pygame.QUIT:
                 return None
 
             else:
 
-                for c in self.components:
+                for c in self.event_targets.get(event.type, ()):
                     c.check_event(event)
+                    self.changed = True
 
         for c in self.components:
             c.step(ms_per_step)
@@ -848,45 +1054,169 @@ class Options:
             return lambda: Options(), self.config
 
         # Each control must be updated using `self.config`. The values
-        # they return are what should be stored in `self.config`.
+        # they return are what should be stored in `self.config`. The
+        # new config is only created once, after all of the values are
+        # known.
 
-        if self.fullscreen_button.pressed:
+        fullscreen = self.config.fullscreen
 
-            self.config = self.config._replace(
-                fullscreen=not self.config.fullscreen)
+        if self.fullscreen_button.pressed:
+            fullscreen = not fullscreen
 
         self.fullscreen_button.text = \
-            'Enabled' if self.config.fullscreen else 'Disabled'
+            'Enabled' if fullscreen else 'Disabled'
 
         self.config = self.config._replace(
-            resolution=self.res_display.res_update(self.config.resolution))
-
-        self.config = self.config._replace(
-            volume=self.vol_display.vol_update(self.config.volume))
+            fullscreen=fullscreen,
+            resolution=self.res_display.res_update(self.config.resolution),
+            volume=self.vol_display.vol_update(self.config.volume)
+            )
 
         return self
 
-    def render(self, surface: Surface) -> None:
-        """Render this state to the given surface."""
-        validate(self.render, locals())
+    def render(self, surface: Surface) -> list:
+        """Render this state to the given surface.
+
+        Returns the list of areas of the surface that have changed
+        since the last render.
+        """
+
+        # Components only change when they are given an event or when
+        # the config is first read, so if neither has happened, nothing
+        # needs to be rendered.
+
+        if not self.changed:
+            return []
+
+        self.changed = False
 
         # Before rendering each component, the screen must be cleared
         # to black.
 
         surface.fill((0, 0, 0))
+        dirty_rects = []
 
         for c in self.components:
-            c.render(surface)
+            dirty_rects.extend(c.render(surface))
+
+        return dirty_rects
+
+def new_world() -> World:
+    """
+    Returns a new randomly generated world for a game, containing a
+    hero that has not been named yet.
+    """
+
+    return renethack.world.make_world(
+        levels=LEVELS,
+        level_length=LEVEL_LENGTH,
+        hero=renethack.entity.rand_hero('')
+        )
+
+def event_targets(components: list) -> dict:
+    """
+    Returns a map of event types to the components in `components`
+    that respond to them, in the same order as `components`.
+    """
+    validate(event_targets, locals())
+
+    targets = {}
+
+    for c in components:
+        for event_type in c.EVENT_TYPES:
+            targets.setdefault(event_type, []).append(c)
+
+    return targets
 
 def load_scores() -> list:
     """Returns the list of `Score` objects from the score file.
 
-    Returns an empty list if the score file does not exist.
+    Returns an empty list if the score file does not exist or cannot
+    be read, in which case it will be replaced when a score is next
+    saved.
     """
 
-    if os.path.exists(scores_path):
+    # The scores only change when they are saved, so the file only
+    # needs to be read the first time. A copy is returned so that the
+    # cached list is not modified.
+
+    if scores_path not in loaded_scores:
+        loaded_scores[scores_path] = read_scores()
+
+    return list(loaded_scores[scores_path])
+
+def read_scores() -> list:
+    """Returns the list of `Score` objects read from the score file.
+
+    Returns an empty list if the score file does not exist or cannot
+    be read.
+    """
+
+    # Opening the file directly, rather than checking that it exists
+    # first, needs one less system call. The file is small, so it is
+    # read in one call and decoded from memory.
+
+    try:
         with open(scores_path, 'rb') as file:
-            return pickle.load(file)
+            return decode_scores(file.read())
 
-    else:
+    except (OSError, struct.error, UnicodeDecodeError):
         return []
+
+def write_scores(scores: list) -> None:
+    """Write `scores` to the score file.
+
+    The scores are written to a temporary file which then replaces the
+    score file, so that it is never left partially written.
+    """
+    validate(write_scores, locals())
+
+    temp_path = scores_path + '.tmp'
+
+    with open(temp_path, 'wb') as file:
+        file.write(encode_scores(scores))
+
+    os.replace(temp_path, scores_path)
+
+def encode_scores(scores: list) -> bytes:
+    """Returns the contents of a scores file containing `scores`."""
+    validate(encode_scores, locals())
+
+    parts = [SCORE_COUNT_FORMAT.pack(len(scores))]
+
+    for score in scores:
+        name = score.name.encode('utf-8')
+        parts.append(SCORE_FORMAT.pack(len(name), score.level, score.score))
+        parts.append(name)
+
+    return b''.join(parts)
+
+def decode_scores(data: bytes) -> list:
+    """Returns the list of `Score` objects in the contents of a scores
+    file.
+
+    Raises `struct.error` if `data` is too short.
+    """
+    validate(decode_scores, locals())
+
+    count, = SCORE_COUNT_FORMAT.unpack_from(data)
+    offset = SCORE_COUNT_FORMAT.size
+    scores = []
+
+    for i in range(count):
+
+        name_length, level, score = SCORE_FORMAT.unpack_from(data, offset)
+        offset += SCORE_FORMAT.size
+
+        name, = struct.unpack_from('{}s'.format(name_length), data, offset)
+        offset += name_length
+
+        scores.append(
+            Score(
+                name=name.decode('utf-8'),
+                level=level,
+                score=score
+                )
+            )
+
+    return scores
@@ -2,44 +2,81 @@ import sys
 import os
 import time
 import random
+import functools
 
-def validate(func, args: dict) -> bool:
-    """Tests whether the values in `args` have the correct types.
+annotation_checks = {}
+# A map of code objects to the pairs of parameter names and types that
+# `validate` checks for the functions that use them.
 
-    The annotations on `func` must be types. Parameters without an
-    annotation are ignored.
-    """
+# Running Python with `-O` turns off `__debug__`, in which case the
+# type checks are skipped entirely.
+
+if __debug__:
+
+    def validate(func, args: dict) -> bool:
+        """Tests whether the values in `args` have the correct types.
+
+        The annotations on `func` must be types. Parameters without an
+        annotation are ignored. The annotations of each function are only
+        read the first time it is validated.
+        """
+
+        # A new bound method is created every time a method is accessed,
+        # and a new function every time a nested function is defined, so
+        # the checks are stored by the underlying code object instead.
+
+        code = getattr(func, '__func__', func).__code__
+        checks = annotation_checks.get(code)
+
+        if checks is None:
 
-    for name, type_ in func.__annotations__.items():
-        if name != 'return' and not isinstance(args[name], type_):
             # Ignore any return annotation.
 
-            raise TypeError('argument {} = {}: expected {}, found {}'
-                .format(
-                    name,
-                    args[name],
-                    type_.__name__,
-                    type(args[name]).__name__
+            checks = [
+                (name, type_)
+                for name, type_ in func.__annotations__.items()
+                if name != 'return'
+                ]
+
+            annotation_checks[code] = checks
+
+        for name, type_ in checks:
+            if not isinstance(args[name], type_):
+
+                raise TypeError('argument {} = {}: expected {}, found {}'
+                    .format(
+                        name,
+                        args[name],
+                        type_.__name__,
+                        type(args[name]).__name__
+                        )
                     )
-                )
 
+else:
+
+    def validate(func, args: dict) -> bool:
+        """Does nothing, as type checking is turned off."""
+
+@functools.lru_cache(maxsize=None)
 def get_maindir() -> str:
     """
     Return the path to the directory that
     the top level python file is contained in.
 
     The top level file is the file that is running as a script
-    (not imported).
+    (not imported). The path is only resolved once, as resolving it
+    requires a system call for each directory in it.
     """
     return os.path.dirname(os.path.realpath(sys.argv[0]))
 
 def get_millitime() -> float:
     """Return the current time in milliseconds.
 
-    `time.monotonic` is used to get the time. The returned
-    value may therefore be negative.
+    `time.perf_counter_ns` is used to get the time, so that it has a
+    higher resolution than `time.monotonic`. The returned value is only
+    meaningful when compared with another call to this function.
     """
-    return time.monotonic() * 1000.0
+    return time.perf_counter_ns() / 1000000.0
 
 def forany(pred, list_: list) -> bool:
     """Tests whether a predicate holds for any element of a list."""